@@ -1,20 +1,30 @@
 #!/usr/bin/env python3
-"""Advanced usage example for memcore"""
+"""Advanced usage example for strategix"""
 
 import asyncio
-from memcore import SmartPlanner
+
+from strategix import TaskPlanner, TaskPriority, TaskType
 
 
 async def advanced_example():
     """Advanced async example"""
     # Initialize with custom config
     config = {
-        # TODO: Add configuration options
+        "max_concurrent_tasks": 2,
+        "max_cache_entries": 256,
     }
-    instance = SmartPlanner(config)
-    
-    # TODO: Add advanced usage examples
-    print(f"Advanced usage with {instance}")
+    planner = TaskPlanner(config=config)
+
+    # Queue tasks and let the execution loop run them in priority order
+    await planner.create_task("Summarize recent findings", TaskType.RESEARCH, TaskPriority.LOW)
+    await planner.create_task("Fix the failing build", TaskType.CODING, TaskPriority.CRITICAL)
+    loop = asyncio.create_task(planner.run_execution_loop())
+    while any(status["status"] in ("pending", "in_progress") for status in planner.get_all_tasks()):
+        await asyncio.sleep(1)
+    loop.cancel()
+
+    for status in planner.get_all_tasks():
+        print(f"{status['description']}: {status['status']} ({status['progress']:.0%})")
 
 
 if __name__ == "__main__":
@@ -1,17 +1,20 @@
 #!/usr/bin/env python3
-"""Basic usage example for memcore"""
+"""Basic usage example for strategix"""
 
-from memcore import SmartPlanner
+import asyncio
 
+from strategix import TaskPlanner, TaskType
 
-def main():
+
+async def main():
     """Main example function"""
-    # Initialize
-    instance = SmartPlanner()
-    
-    # TODO: Add actual usage examples
-    print(f"Using {instance}")
+    # Initialize without an LLM engine; plans come from the built-in templates
+    planner = TaskPlanner()
+
+    task = await planner.create_task("Write a CSV parser", TaskType.CODING)
+    result = await planner.execute_task(task)
+    print(f"Task {result['task_id']} finished as {result['status']}")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
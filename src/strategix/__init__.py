@@ -8,10 +8,15 @@ A powerful Python package extracted from MemCore.
 __version__ = "0.1.0"
 __author__ = "MemCore Contributors"
 
-from .core import SmartPlanner
+from .core import Task, TaskPlanner, TaskPriority, TaskStatus, TaskStep, TaskType
 from .exceptions import SmartPlannerError
 
 __all__ = [
-    "SmartPlanner",
+    "Task",
+    "TaskPlanner",
+    "TaskPriority",
+    "TaskStatus",
+    "TaskStep",
+    "TaskType",
     "SmartPlannerError",
 ]
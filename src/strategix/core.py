@@ -1,18 +1,76 @@
-import pendulum
 import orjson
 """Core implementation of smart-planner"""
 
 import asyncio
-import json
-from typing import Dict, Any, Optional, List, Tuple, Union, Callable
+import copy
+import hashlib
+import itertools
+import os
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Any, Optional, List, Tuple, Union, Callable, Collection, FrozenSet, Iterable
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
+from types import MappingProxyType
 import uuid
 from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
 from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import HumanMessage, SystemMessage
+try:
+    import numpy as np
+except ImportError:
+    np = None
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+_PLANNING_SYSTEM_PREFIX = 'You are an expert task planner. Break down the task given at the end into actionable steps.\n\nProvide a detailed plan with the following structure for each step:\n1. Clear description of what needs to be done\n2. Specific action to take\n3. Prerequisites (step IDs that must complete first)\n4. Estimated duration in seconds\n5. Required tools or resources\n6. Validation criteria to confirm completion\n\nOutput the plan as a JSON array with this structure:\n[\n  {\n    "step_id": "step_1",\n    "description": "...",\n    "action": "...",\n    "prerequisites": [],\n    "estimated_duration": 60,\n    "required_tools": ["tool1", "tool2"],\n    "validation_criteria": ["criterion1", "criterion2"]\n  },\n  ...\n]\n\n'
+_PLANNING_USER_FORMAT = 'Task: {0}\nType: {1}\nContext: {2}\n\nPlan:'
+_ID_PREFIX = f'{os.getpid():x}{int(time.time()):x}'
+_id_counter = itertools.count()
+_JSON_FENCE_RE = re.compile('```(?:json)?\\s*(.*?)\\s*```', re.DOTALL)
+
+
+def _fast_id() -> str:
+    """Generate a short id that is unique within this process"""
+    return f'{_ID_PREFIX}-{next(_id_counter):x}'
+
+
+def _uuid_id() -> str:
+    """Generate a globally unique id"""
+    return str(uuid.uuid4())
+
+
+def _wall_clock(t_ns: int) -> datetime:
+    """Convert a perf_counter_ns reading to an approximate wall-clock time"""
+    return datetime.now() - timedelta(microseconds=(time.perf_counter_ns() - t_ns) / 1000)
+
+
+def _materialize_timestamps(item: Any):
+    """Fill started_at/completed_at from the monotonic readings taken during execution"""
+    if item.started_at is None and item._t_start_ns is not None:
+        item.started_at = _wall_clock(item._t_start_ns)
+    if item.completed_at is None and item._t_end_ns is not None:
+        item.completed_at = _wall_clock(item._t_end_ns)
+
+
+def _parse_json_plan(response: str) -> Optional[List[Dict[str, Any]]]:
+    """Parse a non-empty JSON plan array, accepting Markdown code fences"""
+    fenced = _JSON_FENCE_RE.search(response)
+    candidates = (fenced.group(1), response) if fenced else (response,)
+    for candidate in candidates:
+        try:
+            plan = orjson.loads(candidate)
+        except (orjson.JSONDecodeError, ValueError):
+            continue
+        if isinstance(plan, list) and plan:
+            return plan
+    return None
 
 
 class TaskStatus(Enum):
@@ -42,13 +100,18 @@ class TaskType(Enum):
     LEARNING = 'learning'
     COMMUNICATION = 'communication'
     DECISION = 'decision'
+_STATUS_STR = {m: m.value for m in TaskStatus}
+_PRIO_STR = {m: m.value for m in TaskPriority}
+_TYPE_STR = {m: m.value for m in TaskType}
+_TASK_TEMPLATES = MappingProxyType({'code_generation': {'steps': [{'action': 'understand_requirements', 'duration': 30}, {'action': 'design_solution', 'duration': 60}, {'action': 'implement_code', 'duration': 180}, {'action': 'test_implementation', 'duration': 120}, {'action': 'refactor_optimize', 'duration': 90}]}, 'problem_solving': {'steps': [{'action': 'analyze_problem', 'duration': 60}, {'action': 'identify_constraints', 'duration': 30}, {'action': 'generate_solutions', 'duration': 90}, {'action': 'evaluate_options', 'duration': 60}, {'action': 'implement_solution', 'duration': 120}]}, 'research': {'steps': [{'action': 'define_scope', 'duration': 30}, {'action': 'gather_information', 'duration': 180}, {'action': 'analyze_findings', 'duration': 120}, {'action': 'synthesize_insights', 'duration': 90}, {'action': 'create_summary', 'duration': 60}]}})
+_TEMPLATE_MAP = MappingProxyType({TaskType.CODING: 'code_generation', TaskType.RESEARCH: 'research', TaskType.ANALYSIS: 'problem_solving'})
 @dataclass
 class TaskStep:
     """Represents a single step in a task plan"""
     step_id: str
     description: str
     action: str
-    prerequisites: List[str] = field(default_factory=list)
+    prerequisites: FrozenSet[str] = field(default_factory=frozenset)
     estimated_duration: int = 60
     required_tools: List[str] = field(default_factory=list)
     validation_criteria: List[str] = field(default_factory=list)
@@ -58,26 +121,51 @@ class TaskStep:
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
 
-    def is_ready(self, completed_steps: List[str]) -> bool:
+    def __post_init__(self):
+        self.prerequisites = frozenset(self.prerequisites)
+        # Timing and scheduling state are plain attributes rather than fields, so they stay
+        # out of the constructor, asdict/astuple and dataclasses.replace. _owner_task is a
+        # back-reference set by Task.add_step; Task and TaskStep form a cycle through it.
+        self._t_start_ns: Optional[int] = None
+        self._t_end_ns: Optional[int] = None
+        self._owner_task: Optional[Task] = None
+        self._idx = -1
+
+    def _set_status(self, status: TaskStatus):
+        """Change status, keeping the owning task's scheduling state in sync"""
+        if self._owner_task is not None:
+            self._owner_task._update_step_status(self, status)
+        self.status = status
+
+    def is_ready(self, completed_steps: Iterable[str]) -> bool:
         """Check if this step is ready to execute"""
-        return all((prereq in completed_steps for prereq in self.prerequisites))
+        return self.prerequisites.issubset(completed_steps)
 
     def mark_started(self):
         """Mark step as started"""
-        self.status = TaskStatus.IN_PROGRESS
-        self.started_at = pendulum.now()
+        self._set_status(TaskStatus.IN_PROGRESS)
+        self._t_start_ns = time.perf_counter_ns()
+        self.started_at = None
 
     def mark_completed(self, result: Any=None):
         """Mark step as completed"""
-        self.status = TaskStatus.COMPLETED
-        self.completed_at = pendulum.now()
+        self._set_status(TaskStatus.COMPLETED)
+        self._t_end_ns = time.perf_counter_ns()
+        self.completed_at = None
         self.result = result
 
     def mark_failed(self, error: str):
         """Mark step as failed"""
-        self.status = TaskStatus.FAILED
-        self.completed_at = pendulum.now()
+        self._set_status(TaskStatus.FAILED)
+        self._t_end_ns = time.perf_counter_ns()
+        self.completed_at = None
         self.error = error
+
+    def mark_cancelled(self):
+        """Mark step as cancelled"""
+        self._set_status(TaskStatus.CANCELLED)
+        self._t_end_ns = time.perf_counter_ns()
+        self.completed_at = None
 @dataclass
 class Task:
     """Represents a complex task to be decomposed and executed"""
@@ -92,24 +180,79 @@ class Task:
     completed_at: Optional[datetime] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
 
+    def __post_init__(self):
+        # Timing, caching and scheduling state are plain attributes rather than fields, so
+        # each instance (including one made by dataclasses.replace) starts with its own.
+        self._t_start_ns: Optional[int] = None
+        self._t_end_ns: Optional[int] = None
+        self._metadata_json: Optional[Tuple[Dict[str, Any], str]] = None
+        self._ids: List[str] = []
+        self._statuses: List[TaskStatus] = []
+        self._indegrees: List[int] = []
+        self._dependents: List[List[int]] = []
+        self._index: Dict[str, int] = {}
+        self._waiting: Dict[str, List[int]] = {}
+        self._n_done = 0
+        self._n_cancelled = 0
+        self._strategy: Optional[Callable[..., Any]] = None
+        (steps, self.steps) = (self.steps, [])
+        for step in steps:
+            self.add_step(step)
+
+    def _count_status(self, status: TaskStatus, delta: int):
+        """Adjust the finished-step counters for a step entering or leaving a status"""
+        if status == TaskStatus.COMPLETED:
+            self._n_done += delta
+        elif status == TaskStatus.CANCELLED:
+            self._n_cancelled += delta
+
+    def _update_step_status(self, step: TaskStep, status: TaskStatus):
+        """Record a step status change in the counters and the status array"""
+        self._count_status(step.status, -1)
+        self._count_status(status, 1)
+        self._statuses[step._idx] = status
+
     def add_step(self, step: TaskStep):
-        """Add a step to the task plan"""
+        """Add a step to the task plan; a step reports status changes to the first task it joins"""
+        idx = len(self.steps)
+        if step._owner_task is None:
+            step._owner_task = self
+            step._idx = idx
+        self._count_status(step.status, 1)
         self.steps.append(step)
+        self._ids.append(step.step_id)
+        self._statuses.append(step.status)
+        self._indegrees.append(len(step.prerequisites))
+        self._dependents.append(self._waiting.pop(step.step_id, []))
+        self._index[step.step_id] = idx
+        for prereq in step.prerequisites:
+            if prereq in self._index:
+                self._dependents[self._index[prereq]].append(idx)
+            else:
+                self._waiting.setdefault(prereq, []).append(idx)
+
+    def _reset_indegrees(self):
+        """Restore every step's count of unfinished prerequisites"""
+        self._indegrees = [len(step.prerequisites) for step in self.steps]
 
-    def get_ready_steps(self, completed_step_ids: List[str]) -> List[TaskStep]:
+    def get_ready_steps(self, completed_step_ids: Optional[Collection[str]]=None) -> List[TaskStep]:
         """Get steps that are ready to execute"""
+        if completed_step_ids is None:
+            statuses = self._statuses
+            indegrees = self._indegrees
+            return [self.steps[i] for i in range(len(statuses)) if statuses[i] is TaskStatus.PENDING and indegrees[i] == 0]
+        completed_step_ids = set(completed_step_ids)
         return [step for step in self.steps if step.status == TaskStatus.PENDING and step.is_ready(completed_step_ids)]
 
     def is_complete(self) -> bool:
         """Check if all steps are complete"""
-        return all((step.status in [TaskStatus.COMPLETED, TaskStatus.CANCELLED] for step in self.steps))
+        return self._n_done + self._n_cancelled == len(self.steps)
 
     def get_progress(self) -> float:
         """Get task completion progress (0-1)"""
         if not self.steps:
             return 0.0
-        completed = sum((1 for step in self.steps if step.status in [TaskStatus.COMPLETED, TaskStatus.CANCELLED]))
-        return completed / len(self.steps)
+        return (self._n_done + self._n_cancelled) / len(self.steps)
 class TaskPlanner:
     """Autonomous task planning and execution system"""
 
@@ -117,53 +260,163 @@ class TaskPlanner:
         self.config = config or {}
         self.llm_engine = llm_engine
         self.tasks = {}
-        self.execution_queue = asyncio.Queue()
+        self.execution_queue = asyncio.PriorityQueue()
+        self._queue_seq = itertools.count()
+        self._slot_freed = None
+        self._slot_freed_loop = None
         self.running_tasks = {}
         self.max_concurrent_tasks = self.config.get('max_concurrent_tasks', 3)
-        self.task_templates = self._load_task_templates()
+        self._new_id = _uuid_id if self.config.get('use_uuid', False) else _fast_id
+        self._step_semaphore = None
+        self._step_semaphore_loop = None
+        self.max_cache_entries = self.config.get('max_cache_entries', 1024)
+        self._plan_cache = OrderedDict()
+        self._step_cache = OrderedDict()
+        self.semantic_threshold = self.config.get('semantic_threshold', 0.92)
+        self._embed_fn = self.config.get('embed_fn')
+        self._semantic_cache_enabled = np is not None and (self._embed_fn is not None or (self.config.get('semantic_cache', False) and SENTENCE_TRANSFORMERS_AVAILABLE))
+        self._semantic_index = {}
+        self._semantic_order = deque()
+        self.task_templates = _TASK_TEMPLATES
         self.execution_strategies = {TaskType.RESEARCH: self._execute_research_step, TaskType.CODING: self._execute_coding_step, TaskType.ANALYSIS: self._execute_analysis_step, TaskType.CREATIVE: self._execute_creative_step, TaskType.SYSTEM: self._execute_system_step, TaskType.LEARNING: self._execute_learning_step, TaskType.COMMUNICATION: self._execute_communication_step, TaskType.DECISION: self._execute_decision_step}
-        self.planning_prompt = PromptTemplate(input_variables=['task_description', 'task_type', 'context'], template='You are an expert task planner. Break down the following task into actionable steps.\n\nTask: {task_description}\nType: {task_type}\nContext: {context}\n\nProvide a detailed plan with the following structure for each step:\n1. Clear description of what needs to be done\n2. Specific action to take\n3. Prerequisites (step IDs that must complete first)\n4. Estimated duration in seconds\n5. Required tools or resources\n6. Validation criteria to confirm completion\n\nOutput the plan as a JSON array with this structure:\n[\n  {{\n    "step_id": "step_1",\n    "description": "...",\n    "action": "...",\n    "prerequisites": [],\n    "estimated_duration": 60,\n    "required_tools": ["tool1", "tool2"],\n    "validation_criteria": ["criterion1", "criterion2"]\n  }},\n  ...\n]\n\nPlan:')
+        self.planning_prompt = PromptTemplate(input_variables=['task_description', 'task_type', 'context'], template=_PLANNING_SYSTEM_PREFIX.replace('{', '{{').replace('}', '}}') + _PLANNING_USER_FORMAT.format('{task_description}', '{task_type}', '{context}'))
+
+    @staticmethod
+    def _cache_key(*parts: Any) -> bytes:
+        """Build an exact-match cache key from JSON-serializable parts"""
+        return hashlib.blake2b(orjson.dumps(parts, option=orjson.OPT_SORT_KEYS)).digest()
+
+    def _cache_get(self, cache: OrderedDict, key: bytes) -> Any:
+        """Look up a cached value and mark it as recently used"""
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+    def _cache_put(self, cache: OrderedDict, key: bytes, value: Any):
+        """Store a value, evicting the least recently used entries over the limit"""
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.max_cache_entries:
+            cache.popitem(last=False)
+
+    def _embed(self, text: str) -> Any:
+        """Embed text as a unit-length float32 vector, or None if it cannot be normalized"""
+        if self._embed_fn is None:
+            self._embed_fn = SentenceTransformer(self.config.get('embedding_model', 'all-MiniLM-L6-v2')).encode
+        embedding = np.asarray(self._embed_fn(text), dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        if not np.isfinite(norm) or norm == 0:
+            return None
+        return embedding / norm
 
-    def _load_task_templates(self) -> Dict[str, Dict[str, Any]]:
-        """Load predefined task templates"""
-        return {'code_generation': {'steps': [{'action': 'understand_requirements', 'duration': 30}, {'action': 'design_solution', 'duration': 60}, {'action': 'implement_code', 'duration': 180}, {'action': 'test_implementation', 'duration': 120}, {'action': 'refactor_optimize', 'duration': 90}]}, 'problem_solving': {'steps': [{'action': 'analyze_problem', 'duration': 60}, {'action': 'identify_constraints', 'duration': 30}, {'action': 'generate_solutions', 'duration': 90}, {'action': 'evaluate_options', 'duration': 60}, {'action': 'implement_solution', 'duration': 120}]}, 'research': {'steps': [{'action': 'define_scope', 'duration': 30}, {'action': 'gather_information', 'duration': 180}, {'action': 'analyze_findings', 'duration': 120}, {'action': 'synthesize_insights', 'duration': 90}, {'action': 'create_summary', 'duration': 60}]}}
+    def _semantic_plan_lookup(self, task: Task, query_embed: Any) -> Optional[List[Dict[str, Any]]]:
+        """Reuse the plan of the most similar cached task, rewritten for this task"""
+        index = self._semantic_index.get((task.task_type, self._meta(task)))
+        if index is None:
+            return None
+        (embeds, entries) = index
+        sims = embeds @ query_embed
+        best = int(np.argmax(sims))
+        if not sims[best] >= self.semantic_threshold:
+            return None
+        (pattern, plan) = entries[best]
+        plan = copy.deepcopy(plan)
+        for step_data in plan:
+            step_data['description'] = pattern.sub(lambda _: task.description, step_data.get('description', ''))
+        return plan
+
+    def _semantic_plan_store(self, task: Task, query_embed: Any, plan: List[Dict[str, Any]]):
+        """Index a generated plan by description embedding, grouped by task type and metadata"""
+        scope = (task.task_type, self._meta(task))
+        row = query_embed[np.newaxis, :]
+        entry = (re.compile(re.escape(task.description)), plan)
+        index = self._semantic_index.get(scope)
+        if index is None:
+            self._semantic_index[scope] = [row, [entry]]
+        else:
+            index[0] = np.vstack((index[0], row))
+            index[1].append(entry)
+        self._semantic_order.append(scope)
+        while len(self._semantic_order) > self.max_cache_entries:
+            oldest_scope = self._semantic_order.popleft()
+            oldest = self._semantic_index[oldest_scope]
+            if len(oldest[1]) == 1:
+                del self._semantic_index[oldest_scope]
+            else:
+                oldest[0] = oldest[0][1:]
+                del oldest[1][0]
 
     async def create_task(self, description: str, task_type: TaskType=TaskType.ANALYSIS, priority: TaskPriority=TaskPriority.MEDIUM, context: Dict[str, Any]=None) -> Task:
         """Create a new task and plan its execution"""
-        task_id = str(uuid.uuid4())
+        task_id = self._new_id()
         task = Task(task_id=task_id, description=description, task_type=task_type, priority=priority, metadata=context or {})
+        task._strategy = self._resolve_strategy(task_type)
         task.status = TaskStatus.PLANNING
         plan = await self._generate_plan(task)
         for step_data in plan:
-            step = TaskStep(step_id=step_data.get('step_id', str(uuid.uuid4())), description=step_data.get('description', ''), action=step_data.get('action', ''), prerequisites=step_data.get('prerequisites', []), estimated_duration=step_data.get('estimated_duration', 60), required_tools=step_data.get('required_tools', []), validation_criteria=step_data.get('validation_criteria', []))
+            step = TaskStep(step_id=step_data.get('step_id') or self._new_id(), description=step_data.get('description', ''), action=step_data.get('action', ''), prerequisites=frozenset(step_data.get('prerequisites', [])), estimated_duration=step_data.get('estimated_duration', 60), required_tools=step_data.get('required_tools', []), validation_criteria=step_data.get('validation_criteria', []))
             task.add_step(step)
         self.tasks[task_id] = task
         task.status = TaskStatus.PENDING
-        await self.execution_queue.put(task)
+        await self.execution_queue.put((_PRIO_STR[task.priority], next(self._queue_seq), task))
         return task
 
     async def _generate_plan(self, task: Task) -> List[Dict[str, Any]]:
         """Generate execution plan for a task"""
-        if self.llm_engine and LANGCHAIN_AVAILABLE:
+        if self.llm_engine:
             try:
+                cache_key = self._cache_key(task.description, _TYPE_STR[task.task_type], task.metadata)
+                cached_plan = self._cache_get(self._plan_cache, cache_key)
+                if cached_plan is not None:
+                    return copy.deepcopy(cached_plan)
+                query_embed = None
+                if self._semantic_cache_enabled:
+                    query_embed = await asyncio.get_running_loop().run_in_executor(None, self._embed, task.description)
+                    similar_plan = None if query_embed is None else self._semantic_plan_lookup(task, query_embed)
+                    if similar_plan is not None:
+                        return similar_plan
                 llm = self.llm_engine.select_best_llm('reasoning')
                 if llm:
-                    chain = LLMChain(llm=llm, prompt=self.planning_prompt)
-                    response = await chain.arun(task_description=task.description, task_type=task.task_type.value, context=orjson.dumps(task.metadata).decode())
-                    try:
-                        plan = orjson.loads(response)
-                        if isinstance(plan, list) and plan:
-                            return plan
-                    except json.JSONDecodeError:
-                        pass
+                    response = await llm.ainvoke(self._build_planning_input(llm, task))
+                    response = getattr(response, 'content', response)
+                    plan = _parse_json_plan(response)
+                    if plan is not None:
+                        self._cache_put(self._plan_cache, cache_key, copy.deepcopy(plan))
+                        if query_embed is not None:
+                            self._semantic_plan_store(task, query_embed, copy.deepcopy(plan))
+                        return plan
             except Exception as e:
                 print(f'Error generating plan with LLM: {e}')
         return self._generate_template_plan(task)
 
+    @staticmethod
+    def _meta(task: Task) -> str:
+        """Serialize task metadata once, re-encoding only if the dict is replaced"""
+        if task._metadata_json is None or task._metadata_json[0] is not task.metadata:
+            task._metadata_json = (task.metadata, orjson.dumps(task.metadata).decode())
+        return task._metadata_json[1]
+
+    def _uses_cache_control(self, llm: Any) -> bool:
+        """Whether to mark the planning prefix with an explicit cache_control block"""
+        enabled = self.config.get('prompt_cache_control')
+        if enabled is not None:
+            return bool(enabled)
+        return str(getattr(llm, '_llm_type', '')).startswith('anthropic')
+
+    def _build_planning_input(self, llm: Any, task: Task) -> Union[str, List[Any]]:
+        """Build the planning request with the static instructions as a cacheable prefix"""
+        fields = (task.description, _TYPE_STR[task.task_type], self._meta(task))
+        if not isinstance(llm, BaseChatModel):
+            return _PLANNING_SYSTEM_PREFIX + _PLANNING_USER_FORMAT.format(*fields)
+        system_content = _PLANNING_SYSTEM_PREFIX
+        if self._uses_cache_control(llm):
+            system_content = [{'type': 'text', 'text': _PLANNING_SYSTEM_PREFIX, 'cache_control': {'type': 'ephemeral'}}]
+        return [SystemMessage(content=system_content), HumanMessage(content=_PLANNING_USER_FORMAT.format(*fields))]
+
     def _generate_template_plan(self, task: Task) -> List[Dict[str, Any]]:
         """Generate plan using templates"""
-        template_map = {TaskType.CODING: 'code_generation', TaskType.RESEARCH: 'research', TaskType.ANALYSIS: 'problem_solving'}
-        template_name = template_map.get(task.task_type, 'problem_solving')
+        template_name = _TEMPLATE_MAP.get(task.task_type, 'problem_solving')
         template = self.task_templates.get(template_name, {})
         plan = []
         for (i, step_template) in enumerate(template.get('steps', [])):
@@ -178,46 +431,98 @@ class TaskPlanner:
     async def execute_task(self, task: Task) -> Dict[str, Any]:
         """Execute a task by running its steps"""
         task.status = TaskStatus.IN_PROGRESS
-        task.started_at = pendulum.now()
-        completed_steps = []
+        task._t_start_ns = time.perf_counter_ns()
+        task._t_end_ns = None
+        task.started_at = None
+        task.completed_at = None
+        task._reset_indegrees()
+        indegrees = task._indegrees
+        statuses = task._statuses
+        running = {asyncio.create_task(self._execute_step(task, step)): step._idx for step in task.get_ready_steps()}
         results = {}
-        while not task.is_complete():
-            ready_steps = task.get_ready_steps(completed_steps)
-            if not ready_steps:
-                pending_steps = [s for s in task.steps if s.status == TaskStatus.PENDING]
-                if pending_steps:
-                    task.status = TaskStatus.BLOCKED
-                    break
-            step_tasks = []
-            for step in ready_steps[:self.max_concurrent_tasks]:
-                step_task = asyncio.create_task(self._execute_step(task, step))
-                step_tasks.append((step, step_task))
-            for (step, step_task) in step_tasks:
-                try:
-                    result = await step_task
-                    results[step.step_id] = result
-                    completed_steps.append(step.step_id)
-                except Exception as e:
-                    step.mark_failed(str(e))
+        try:
+            while running:
+                (done, _) = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for step_task in done:
+                    idx = running.pop(step_task)
+                    if step_task.cancelled():
+                        task.steps[idx].mark_cancelled()
+                        continue
+                    error = step_task.exception()
+                    if error is not None:
+                        if statuses[idx] in (TaskStatus.PENDING, TaskStatus.IN_PROGRESS):
+                            task.steps[idx].mark_failed(str(error))
+                        continue
+                    results[task._ids[idx]] = step_task.result()
+                    for dependent in task._dependents[idx]:
+                        indegrees[dependent] -= 1
+                        if indegrees[dependent] == 0 and statuses[dependent] is TaskStatus.PENDING:
+                            running[asyncio.create_task(self._execute_step(task, task.steps[dependent]))] = dependent
+        except BaseException as e:
+            await self._cancel_steps(task, running)
+            task.status = TaskStatus.CANCELLED if isinstance(e, asyncio.CancelledError) else TaskStatus.FAILED
+            raise
         if task.is_complete():
             task.status = TaskStatus.COMPLETED
-            task.completed_at = pendulum.now()
-        return {'task_id': task.task_id, 'status': task.status.value, 'progress': task.get_progress(), 'results': results, 'duration': (task.completed_at - task.started_at).total_seconds() if task.completed_at else None}
+            task._t_end_ns = time.perf_counter_ns()
+        elif TaskStatus.PENDING in statuses:
+            task.status = TaskStatus.BLOCKED
+        else:
+            task.status = TaskStatus.FAILED
+        return {'task_id': task.task_id, 'status': _STATUS_STR[task.status], 'progress': task.get_progress(), 'results': results, 'duration': (task._t_end_ns - task._t_start_ns) / 1000000000.0 if task._t_end_ns is not None else None}
+
+    async def _cancel_steps(self, task: Task, running: Dict[asyncio.Task, int]):
+        """Cancel in-flight steps, wait for them to unwind, then cancel every unfinished step"""
+        for step_task in running:
+            step_task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        for (step, status) in zip(task.steps, task._statuses):
+            if status in (TaskStatus.PENDING, TaskStatus.IN_PROGRESS):
+                step.mark_cancelled()
+
+    def _resolve_strategy(self, task_type: TaskType) -> Optional[Callable[..., Any]]:
+        """Get the unbound strategy function for a task type, or None for a custom callable"""
+        strategy = self.execution_strategies.get(task_type, self._execute_generic_step)
+        return strategy.__func__ if getattr(strategy, '__self__', None) is self else None
+
+    def _get_step_semaphore(self) -> asyncio.Semaphore:
+        """Get the step semaphore, creating it on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._step_semaphore_loop is not loop:
+            self._step_semaphore = asyncio.Semaphore(self.max_concurrent_tasks)
+            self._step_semaphore_loop = loop
+        return self._step_semaphore
 
     async def _execute_step(self, task: Task, step: TaskStep) -> Any:
         """Execute a single step of a task"""
-        step.mark_started()
-        try:
-            strategy = self.execution_strategies.get(task.task_type, self._execute_generic_step)
-            result = await strategy(task, step)
-            if await self._validate_step(step, result):
-                step.mark_completed(result)
-            else:
-                step.mark_failed('Validation failed')
-            return result
-        except Exception as e:
-            step.mark_failed(str(e))
-            raise
+        async with self._get_step_semaphore():
+            step.mark_started()
+            try:
+                if task._strategy is None:
+                    task._strategy = self._resolve_strategy(task.task_type)
+                if task._strategy is None:
+                    result = await self.execution_strategies.get(task.task_type, self._execute_generic_step)(task, step)
+                else:
+                    result = await task._strategy(self, task, step)
+                if await self._validate_step(step, result):
+                    step.mark_completed(result)
+                else:
+                    step.mark_failed('Validation failed')
+                return result
+            except Exception as e:
+                step.mark_failed(str(e))
+                raise
+
+    async def _query_llm(self, prompt: str, model_hint: str) -> Any:
+        """Query the LLM engine, reusing the response for an identical prompt"""
+        cache_key = self._cache_key(prompt, model_hint)
+        cached_response = self._cache_get(self._step_cache, cache_key)
+        if cached_response is not None:
+            return cached_response
+        (response, _) = await self.llm_engine.query_with_memory(prompt, model_hint)
+        if response is not None:
+            self._cache_put(self._step_cache, cache_key, response)
+        return response
 
     async def _validate_step(self, step: TaskStep, result: Any) -> bool:
         """Validate step execution results"""
@@ -234,7 +539,7 @@ class TaskPlanner:
         """Execute research-related step"""
         if self.llm_engine:
             try:
-                (response, _) = await self.llm_engine.query_with_memory(f'Research task: {step.description}\nContext: {orjson.dumps(task.metadata).decode()}', 'reasoning')
+                response = await self._query_llm(f'Research task\nContext: {self._meta(task)}\nStep: {step.description}', 'reasoning')
                 return response
             except Exception as e:
                 print(f'Research step failed: {e}')
@@ -244,7 +549,7 @@ class TaskPlanner:
         """Execute coding-related step"""
         if self.llm_engine:
             try:
-                (response, _) = await self.llm_engine.query_with_memory(f'Coding task: {step.description}\nAction: {step.action}', 'coding')
+                response = await self._query_llm(f'Coding task\nAction: {step.action}\nStep: {step.description}', 'coding')
                 return response
             except Exception as e:
                 print(f'Coding step failed: {e}')
@@ -254,7 +559,7 @@ class TaskPlanner:
         """Execute analysis-related step"""
         if self.llm_engine:
             try:
-                (response, _) = await self.llm_engine.query_with_memory(f'Analysis task: {step.description}', 'reasoning')
+                response = await self._query_llm(f'Analysis task: {step.description}', 'reasoning')
                 return response
             except Exception as e:
                 print(f'Analysis step failed: {e}')
@@ -264,7 +569,7 @@ class TaskPlanner:
         """Execute creative task step"""
         if self.llm_engine:
             try:
-                (response, _) = await self.llm_engine.query_with_memory(f'Creative task: {step.description}', 'creative')
+                response = await self._query_llm(f'Creative task: {step.description}', 'creative')
                 return response
             except Exception as e:
                 print(f'Creative step failed: {e}')
@@ -286,21 +591,29 @@ class TaskPlanner:
         """Execute decision-making step"""
         if self.llm_engine:
             try:
-                (response, _) = await self.llm_engine.query_with_memory(f"Decision needed: {step.description}\nOptions: {step.metadata.get('options', [])}", 'reasoning')
+                response = await self._query_llm(f"Decision needed: {step.description}\nOptions: {task.metadata.get('options', [])}", 'reasoning')
                 return response
             except Exception as e:
                 print(f'Decision step failed: {e}')
         return await self._execute_generic_step(task, step)
 
+    def _get_slot_freed(self) -> asyncio.Event:
+        """Get the slot-freed event, creating it on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._slot_freed_loop is not loop:
+            self._slot_freed = asyncio.Event()
+            self._slot_freed_loop = loop
+        return self._slot_freed
+
     async def run_execution_loop(self):
         """Main execution loop for processing tasks"""
         while True:
             try:
-                task = await self.execution_queue.get()
-                if len(self.running_tasks) >= self.max_concurrent_tasks:
-                    await self.execution_queue.put(task)
-                    await asyncio.sleep(1)
-                    continue
+                while len(self.running_tasks) >= self.max_concurrent_tasks:
+                    slot_freed = self._get_slot_freed()
+                    slot_freed.clear()
+                    await slot_freed.wait()
+                (_, _, task) = await self.execution_queue.get()
                 self.running_tasks[task.task_id] = task
                 asyncio.create_task(self._run_task(task))
             except Exception as e:
@@ -317,14 +630,20 @@ class TaskPlanner:
             task.status = TaskStatus.FAILED
         finally:
             self.running_tasks.pop(task.task_id, None)
+            self._get_slot_freed().set()
 
     def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
         """Get status of a specific task"""
         task = self.tasks.get(task_id)
-        if not task:
-            return None
-        return {'task_id': task.task_id, 'description': task.description, 'status': task.status.value, 'progress': task.get_progress(), 'steps': [{'step_id': step.step_id, 'description': step.description, 'status': step.status.value, 'error': step.error} for step in task.steps], 'created_at': task.created_at.isoformat(), 'started_at': task.started_at.isoformat() if task.started_at else None, 'completed_at': task.completed_at.isoformat() if task.completed_at else None}
+        return None if task is None else self._serialize_task(task)
+
+    def _serialize_task(self, task: Task) -> Dict[str, Any]:
+        """Build the status dict for a task"""
+        _materialize_timestamps(task)
+        for step in task.steps:
+            _materialize_timestamps(step)
+        return {'task_id': task.task_id, 'description': task.description, 'status': _STATUS_STR[task.status], 'progress': task.get_progress(), 'steps': [{'step_id': step.step_id, 'description': step.description, 'status': _STATUS_STR[step.status], 'error': step.error} for step in task.steps], 'created_at': task.created_at.isoformat(), 'started_at': task.started_at.isoformat() if task.started_at else None, 'completed_at': task.completed_at.isoformat() if task.completed_at else None}
 
     def get_all_tasks(self) -> List[Dict[str, Any]]:
         """Get status of all tasks"""
-        return [self.get_task_status(task_id) for task_id in self.tasks.keys()]
\ No newline at end of file
+        return [self._serialize_task(task) for task in self.tasks.values()]
\ No newline at end of file
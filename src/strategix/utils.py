@@ -1,11 +1,21 @@
 """Utility functions for smart-planner"""
 
-from typing import Dict, Any, Optional, List, Tuple, Union, Callable
+import threading
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Tuple, Union, Callable
 
+if TYPE_CHECKING:
+    from .core import TaskPlanner
 
-def get_task_planner(llm_engine=None, config: Dict[str, Any]=None) -> TaskPlanner:
+_task_planner: Optional['TaskPlanner'] = None
+_task_planner_lock = threading.Lock()
+
+
+def get_task_planner(llm_engine=None, config: Dict[str, Any]=None) -> 'TaskPlanner':
     """Get or create the global task planner"""
     global _task_planner
     if _task_planner is None:
-        _task_planner = TaskPlanner(llm_engine, config)
-    return _task_planner
\ No newline at end of file
+        with _task_planner_lock:
+            if _task_planner is None:
+                from .core import TaskPlanner
+                _task_planner = TaskPlanner(llm_engine, config)
+    return _task_planner
@@ -0,0 +1,172 @@
+"""Tests for TaskPlanner.execute_task scheduling"""
+
+import asyncio
+import copy
+import dataclasses
+
+import pytest
+from strategix import Task, TaskPlanner, TaskPriority, TaskStatus, TaskStep, TaskType
+
+
+class RecordingPlanner(TaskPlanner):
+    """Planner whose steps sleep for a fixed time and record start/end events"""
+
+    def __init__(self, durations=None, failing=()):
+        super().__init__(config={'max_concurrent_tasks': 3})
+        self.durations = durations or {}
+        self.failing = set(failing)
+        self.events = []
+
+    async def _execute_generic_step(self, task, step):
+        self.events.append(('start', step.step_id))
+        await asyncio.sleep(self.durations.get(step.step_id, 0))
+        if step.step_id in self.failing:
+            raise RuntimeError(f'{step.step_id} exploded')
+        self.events.append(('end', step.step_id))
+        return step.step_id
+
+
+def make_task(*steps):
+    """Build a system task from (step_id, prerequisites) pairs"""
+    task = Task(task_id='task', description='test task', task_type=TaskType.SYSTEM, priority=TaskPriority.MEDIUM)
+    for (step_id, prerequisites) in steps:
+        task.add_step(TaskStep(step_id=step_id, description=step_id, action=step_id, prerequisites=prerequisites))
+    return task
+
+
+def statuses(task):
+    return {step.step_id: step.status for step in task.steps}
+
+
+class TestExecuteTask:
+    """Test cases for dependency-driven step dispatch"""
+
+    @pytest.mark.asyncio
+    async def test_dependent_starts_before_slow_sibling_finishes(self):
+        """A step starts as soon as its own prerequisites finish"""
+        planner = RecordingPlanner(durations={'slow': 0.3})
+        task = make_task(('a', []), ('slow', []), ('b', ['a']))
+        result = await planner.execute_task(task)
+        assert result['status'] == 'completed'
+        assert planner.events.index(('start', 'b')) < planner.events.index(('end', 'slow'))
+
+    @pytest.mark.asyncio
+    async def test_failed_prerequisite_blocks_only_its_dependents(self):
+        """Independent branches still run when another branch fails"""
+        planner = RecordingPlanner(failing=['a'])
+        task = make_task(('a', []), ('b', ['a']), ('c', []), ('d', ['c']))
+        result = await planner.execute_task(task)
+        assert result['status'] == 'blocked'
+        assert statuses(task) == {'a': TaskStatus.FAILED, 'b': TaskStatus.PENDING, 'c': TaskStatus.COMPLETED, 'd': TaskStatus.COMPLETED}
+        assert task.steps[0].error == 'a exploded'
+        assert set(result['results']) == {'c', 'd'}
+
+    @pytest.mark.asyncio
+    async def test_error_outside_step_body_marks_step_failed(self, monkeypatch):
+        """Errors raised before a step starts are recorded on the step"""
+        planner = RecordingPlanner()
+
+        def broken_semaphore():
+            raise RuntimeError('no semaphore')
+        monkeypatch.setattr(planner, '_get_step_semaphore', broken_semaphore)
+        task = make_task(('a', []))
+        result = await planner.execute_task(task)
+        assert result['status'] == 'failed'
+        assert task.steps[0].status == TaskStatus.FAILED
+        assert task.steps[0].error == 'no semaphore'
+
+    @pytest.mark.asyncio
+    async def test_cancellation_cancels_all_unfinished_steps(self):
+        """Cancelling execute_task cancels running and not-yet-started steps"""
+        planner = RecordingPlanner(durations={'a': 10, 'b': 10, 'c': 10})
+        task = make_task(('a', []), ('b', []), ('c', []), ('d', ['a']))
+        execution = asyncio.ensure_future(planner.execute_task(task))
+        await asyncio.sleep(0.05)
+        execution.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await execution
+        assert task.status == TaskStatus.CANCELLED
+        assert set(statuses(task).values()) == {TaskStatus.CANCELLED}
+        assert task.is_complete()
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+
+
+class TestCreatedTask:
+    """Test cases for tasks built by TaskPlanner.create_task"""
+
+    @pytest.mark.asyncio
+    async def test_asdict_and_deepcopy(self):
+        """A planned task does not drag its planner into asdict or deepcopy"""
+        planner = TaskPlanner()
+        task = await planner.create_task('Write a parser', TaskType.CODING)
+        data = dataclasses.asdict(task)
+        assert [step['step_id'] for step in data['steps']] == [step.step_id for step in task.steps]
+        clone = copy.deepcopy(task)
+        assert clone._strategy is task._strategy
+        assert clone.steps[0]._owner_task is clone
+
+    @pytest.mark.asyncio
+    async def test_cached_strategy_runs_on_executing_planner(self):
+        """The per-task strategy honours planner subclasses"""
+        planner = RecordingPlanner()
+        task = await planner.create_task('Deploy', TaskType.SYSTEM)
+        result = await planner.execute_task(task)
+        assert result['status'] == 'completed'
+        assert ('start', task.steps[0].step_id) in planner.events
+
+
+class TestTaskDataclasses:
+    """Test cases for Task and TaskStep as plain dataclasses"""
+
+    def test_asdict_does_not_follow_owner_reference(self):
+        """The step-to-task back-reference is not a dataclass field"""
+        task = make_task(('a', []), ('b', ['a']))
+        data = dataclasses.asdict(task)
+        assert [step['step_id'] for step in data['steps']] == ['a', 'b']
+        assert not [key for key in data if key.startswith('_')]
+        assert not [key for key in data['steps'][0] if key.startswith('_')]
+
+    def test_replace_does_not_share_scheduling_state(self):
+        """dataclasses.replace builds fresh scheduling state and leaves the original intact"""
+        task = make_task(('a', []), ('b', ['a']))
+        copy = dataclasses.replace(task, task_id='copy')
+        assert task._ids == ['a', 'b']
+        assert copy._ids == ['a', 'b']
+        assert copy._statuses is not task._statuses
+        assert all((step._owner_task is task for step in task.steps))
+        task.steps[0].mark_completed('done')
+        assert task.get_progress() == 0.5
+
+    def test_step_status_updates_owner_counters(self):
+        """Marking a step through its methods updates the owning task"""
+        task = make_task(('a', []), ('b', ['a']))
+        task.steps[0].mark_completed('done')
+        assert task.get_progress() == 0.5
+        task.steps[1].mark_cancelled()
+        assert task.is_complete()
+
+
+class PromptEngine:
+    """LLM engine stub recording the prompts it receives"""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def query_with_memory(self, prompt, model_hint):
+        self.prompts.append(prompt)
+        return ('choose B', None)
+
+
+class TestDecisionStep:
+    """Test cases for decision step execution"""
+
+    @pytest.mark.asyncio
+    async def test_options_come_from_task_metadata(self):
+        """Decision prompts list the options stored on the task"""
+        engine = PromptEngine()
+        planner = TaskPlanner(engine)
+        task = Task(task_id='decide', description='pick one', task_type=TaskType.DECISION, priority=TaskPriority.MEDIUM, metadata={'options': ['A', 'B']})
+        step = TaskStep(step_id='choose', description='Pick an option', action='decide')
+        task.add_step(step)
+        assert await planner._execute_decision_step(task, step) == 'choose B'
+        assert engine.prompts == ["Decision needed: Pick an option\nOptions: ['A', 'B']"]
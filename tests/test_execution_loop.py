@@ -0,0 +1,62 @@
+"""Tests for TaskPlanner.run_execution_loop"""
+
+import asyncio
+import time
+
+import pytest
+from strategix import TaskPlanner, TaskPriority, TaskType
+
+
+class InstantPlanner(TaskPlanner):
+    """Planner whose steps finish immediately and which records task start order"""
+
+    def __init__(self):
+        super().__init__(config={'max_concurrent_tasks': 1})
+        self.started = []
+
+    async def execute_task(self, task):
+        self.started.append(task.description)
+        return await super().execute_task(task)
+
+    async def _execute_generic_step(self, task, step):
+        await asyncio.sleep(0)
+        return step.step_id
+
+
+async def run_until_idle(planner, count, timeout=2.0):
+    """Run the execution loop until count tasks have finished"""
+    loop = asyncio.ensure_future(planner.run_execution_loop())
+    try:
+        deadline = time.monotonic() + timeout
+        while len(planner.started) < count or planner.running_tasks:
+            assert time.monotonic() < deadline, 'execution loop stalled'
+            await asyncio.sleep(0.01)
+    finally:
+        loop.cancel()
+
+
+class TestExecutionLoop:
+    """Test cases for priority dispatch and slot wake-up"""
+
+    @pytest.mark.asyncio
+    async def test_critical_task_runs_before_queued_background_work(self):
+        """Queued tasks start in priority order, FIFO within a priority"""
+        planner = InstantPlanner()
+        await planner.create_task('background', TaskType.SYSTEM, TaskPriority.BACKGROUND)
+        await planner.create_task('low', TaskType.SYSTEM, TaskPriority.LOW)
+        await planner.create_task('critical', TaskType.SYSTEM, TaskPriority.CRITICAL)
+        await planner.create_task('low again', TaskType.SYSTEM, TaskPriority.LOW)
+        await run_until_idle(planner, 4)
+        assert planner.started == ['critical', 'low', 'low again', 'background']
+
+    @pytest.mark.asyncio
+    async def test_loop_resumes_when_a_slot_frees(self):
+        """A full loop picks up the next task as soon as the running one finishes"""
+        planner = InstantPlanner()
+        for name in ('first', 'second', 'third'):
+            await planner.create_task(name, TaskType.SYSTEM, TaskPriority.MEDIUM)
+        started = time.monotonic()
+        await run_until_idle(planner, 3)
+        assert planner.started == ['first', 'second', 'third']
+        assert time.monotonic() - started < 0.5
+        assert all((task.status.value == 'completed' for task in planner.tasks.values()))
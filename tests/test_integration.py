@@ -1,7 +1,7 @@
-"""Integration tests for memcore"""
+"""Integration tests for strategix"""
 
 import pytest
-from memcore import SmartPlanner
+from strategix import TaskPlanner
 
 
 @pytest.mark.integration
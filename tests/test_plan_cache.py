@@ -0,0 +1,115 @@
+"""Tests for TaskPlanner plan caching"""
+
+import threading
+
+import orjson
+import pytest
+from strategix import TaskPlanner, TaskType
+
+PLAN = [{'step_id': 'step_1', 'description': 'Write the essay', 'action': 'write', 'prerequisites': [], 'required_tools': ['pen'], 'validation_criteria': ['written']}]
+
+
+class FakeLLM:
+    """LLM stub that always returns the same JSON plan"""
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.calls = 0
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        return orjson.dumps(self.plan).decode()
+
+
+class FakeEngine:
+    """LLM engine stub exposing a single FakeLLM"""
+
+    def __init__(self, plan=PLAN):
+        self.llm = FakeLLM(plan)
+
+    def select_best_llm(self, purpose):
+        return self.llm
+
+
+class TestPlanCache:
+    """Test cases for the exact-match plan cache"""
+
+    @pytest.mark.asyncio
+    async def test_identical_task_reuses_plan(self):
+        """A repeated task is planned without calling the LLM again"""
+        engine = FakeEngine()
+        planner = TaskPlanner(engine)
+        await planner.create_task('Write an essay', TaskType.CREATIVE)
+        task = await planner.create_task('Write an essay', TaskType.CREATIVE)
+        assert engine.llm.calls == 1
+        assert [step.step_id for step in task.steps] == ['step_1']
+
+    @pytest.mark.asyncio
+    async def test_cached_plan_is_not_shared_with_tasks(self):
+        """Mutating a task's steps does not leak into later cache hits"""
+        planner = TaskPlanner(FakeEngine())
+        first = await planner.create_task('Write an essay', TaskType.CREATIVE)
+        first.steps[0].required_tools.append('MUTATED')
+        first.steps[0].validation_criteria.clear()
+        second = await planner.create_task('Write an essay', TaskType.CREATIVE)
+        third = await planner.create_task('Write an essay', TaskType.CREATIVE)
+        second.steps[0].required_tools.append('MUTATED')
+        assert third.steps[0].required_tools == ['pen']
+        assert third.steps[0].validation_criteria == ['written']
+
+
+def word_embedding(text):
+    """Bag-of-words embedding over a tiny fixed vocabulary"""
+    vocabulary = ['write', 'an', 'essay', 'about', 'cats', 'dogs', 'build', 'a', 'bridge']
+    words = text.lower().split()
+    return [float(words.count(word)) + 0.01 for word in vocabulary]
+
+
+class TestSemanticPlanCache:
+    """Test cases for the embedding-similarity plan cache"""
+
+    @pytest.mark.asyncio
+    async def test_similar_description_reuses_plan(self):
+        """A near-duplicate description reuses the plan with the new description substituted"""
+        pytest.importorskip('numpy')
+        engine = FakeEngine([dict(PLAN[0], description='Outline for Write an essay about cats')])
+        planner = TaskPlanner(engine, {'embed_fn': word_embedding, 'semantic_threshold': 0.8})
+        await planner.create_task('Write an essay about cats', TaskType.CREATIVE)
+        task = await planner.create_task('Write an essay about dogs', TaskType.CREATIVE)
+        assert engine.llm.calls == 1
+        assert task.steps[0].description == 'Outline for Write an essay about dogs'
+
+    @pytest.mark.asyncio
+    async def test_different_context_is_planned_again(self):
+        """The same description under different metadata does not reuse the plan"""
+        pytest.importorskip('numpy')
+        engine = FakeEngine()
+        planner = TaskPlanner(engine, {'embed_fn': word_embedding})
+        await planner.create_task('Write an essay', TaskType.CREATIVE, context={'audience': 'kids'})
+        await planner.create_task('Write an essay', TaskType.CREATIVE, context={'audience': 'experts'})
+        assert engine.llm.calls == 2
+
+
+    @pytest.mark.asyncio
+    async def test_embedding_runs_off_the_event_loop(self):
+        """Descriptions are embedded in a worker thread"""
+        pytest.importorskip('numpy')
+        threads = []
+
+        def recording_embedding(text):
+            threads.append(threading.get_ident())
+            return word_embedding(text)
+        planner = TaskPlanner(FakeEngine(), {'embed_fn': recording_embedding})
+        await planner.create_task('Write an essay', TaskType.CREATIVE)
+        assert threads and threading.get_ident() not in threads
+
+    @pytest.mark.asyncio
+    async def test_zero_embedding_skips_semantic_cache(self):
+        """A description that embeds to the zero vector never matches a cached plan"""
+        pytest.importorskip('numpy')
+        engine = FakeEngine()
+        planner = TaskPlanner(engine, {'embed_fn': word_embedding})
+        await planner.create_task('Write an essay', TaskType.CREATIVE)
+        planner._embed_fn = lambda text: [0.0] * 9
+        await planner.create_task('   ', TaskType.CREATIVE)
+        assert engine.llm.calls == 2
@@ -0,0 +1,66 @@
+"""Tests for parsing LLM plan responses"""
+
+import orjson
+import pytest
+from strategix import TaskPlanner, TaskType
+from strategix.core import _parse_json_plan
+
+PLAN = [{'step_id': 'only', 'description': 'Do it', 'action': 'do', 'prerequisites': []}]
+
+
+class StaticLLM:
+    """LLM stub returning a fixed response"""
+
+    def __init__(self, response):
+        self.response = response
+
+    async def ainvoke(self, prompt):
+        return self.response
+
+
+class StaticEngine:
+    """LLM engine stub exposing a single StaticLLM"""
+
+    def __init__(self, response):
+        self.llm = StaticLLM(response)
+
+    def select_best_llm(self, purpose):
+        return self.llm
+
+
+class TestParseJsonPlan:
+    """Test cases for _parse_json_plan"""
+
+    def test_raw_json(self):
+        assert _parse_json_plan(orjson.dumps(PLAN).decode()) == PLAN
+
+    def test_json_fence(self):
+        response = 'Here is the plan:\n```json\n' + orjson.dumps(PLAN).decode() + '\n```\nGood luck.'
+        assert _parse_json_plan(response) == PLAN
+
+    def test_plain_fence(self):
+        response = '```\n' + orjson.dumps(PLAN).decode() + '\n```'
+        assert _parse_json_plan(response) == PLAN
+
+    @pytest.mark.parametrize('response', ['not json', '```json\n[{"step_id": \n```', '[]', '{"step_id": "only"}', ''])
+    def test_unusable_response(self, response):
+        assert _parse_json_plan(response) is None
+
+
+class TestPlanFallback:
+    """Test cases for falling back to template plans"""
+
+    @pytest.mark.asyncio
+    async def test_fenced_response_is_used(self):
+        """A fenced LLM plan is used as the task plan"""
+        planner = TaskPlanner(StaticEngine('```json\n' + orjson.dumps(PLAN).decode() + '\n```'))
+        task = await planner.create_task('Do it', TaskType.ANALYSIS)
+        assert [step.step_id for step in task.steps] == ['only']
+
+    @pytest.mark.asyncio
+    async def test_malformed_response_falls_back_to_template(self):
+        """A response that is not a JSON plan yields the template plan"""
+        planner = TaskPlanner(StaticEngine('I cannot plan this, sorry.'))
+        task = await planner.create_task('Do it', TaskType.CODING)
+        assert [step.action for step in task.steps] == [step['action'] for step in planner.task_templates['code_generation']['steps']]
+        assert planner._plan_cache == {}
@@ -0,0 +1,83 @@
+"""Tests for the planning request sent to the LLM"""
+
+from typing import Any, List
+
+import orjson
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from strategix import Task, TaskPlanner, TaskPriority, TaskType
+
+PLAN = [{'step_id': 'only', 'description': 'Do it', 'action': 'do', 'prerequisites': []}]
+
+
+class RecordingChatModel(BaseChatModel):
+    """Chat model stub that records the messages it receives"""
+
+    llm_type: str = 'fake-chat'
+    received: List[Any] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return self.llm_type
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.received.append(messages)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=orjson.dumps(PLAN).decode()))])
+
+
+class ChatEngine:
+    """LLM engine stub exposing a single chat model"""
+
+    def __init__(self, llm):
+        self.llm = llm
+
+    def select_best_llm(self, purpose):
+        return self.llm
+
+
+def make_task():
+    return Task(task_id='task', description='Ship it', task_type=TaskType.SYSTEM, priority=TaskPriority.HIGH, metadata={'env': 'prod'})
+
+
+class TestPlanningPrompt:
+    """Test cases for TaskPlanner._build_planning_input"""
+
+    def test_plain_llm_gets_single_string(self):
+        """Non-chat LLMs receive the same text as planning_prompt"""
+        planner = TaskPlanner()
+        expected = planner.planning_prompt.format(task_description='Ship it', task_type='system', context='{"env":"prod"}')
+        assert planner._build_planning_input(object(), make_task()) == expected
+
+    def test_chat_model_gets_static_system_and_dynamic_human_message(self):
+        """Chat models receive the static instructions and the task as separate messages"""
+        planner = TaskPlanner()
+        (system, human) = planner._build_planning_input(RecordingChatModel(), make_task())
+        assert isinstance(system, SystemMessage)
+        assert isinstance(human, HumanMessage)
+        assert 'Ship it' not in system.content
+        assert isinstance(system.content, str)
+        assert human.content == 'Task: Ship it\nType: system\nContext: {"env":"prod"}\n\nPlan:'
+
+    def test_anthropic_model_marks_prefix_for_caching(self):
+        """Anthropic chat models get an ephemeral cache_control block on the prefix"""
+        planner = TaskPlanner()
+        (system, _) = planner._build_planning_input(RecordingChatModel(llm_type='anthropic-chat'), make_task())
+        assert system.content[0]['cache_control'] == {'type': 'ephemeral'}
+        assert system.content[0]['text'].startswith('You are an expert task planner')
+
+    @pytest.mark.parametrize(('llm_type', 'flag', 'expected'), [('fake-chat', True, True), ('anthropic-chat', False, False)])
+    def test_config_flag_overrides_detection(self, llm_type, flag, expected):
+        """The prompt_cache_control config flag overrides provider detection"""
+        planner = TaskPlanner(config={'prompt_cache_control': flag})
+        (system, _) = planner._build_planning_input(RecordingChatModel(llm_type=llm_type), make_task())
+        assert isinstance(system.content, list) is expected
+
+    @pytest.mark.asyncio
+    async def test_chat_model_plan_is_used(self):
+        """create_task sends the split messages to a chat model and uses its plan"""
+        llm = RecordingChatModel(received=[])
+        task = await TaskPlanner(ChatEngine(llm)).create_task('Ship it', TaskType.SYSTEM)
+        assert [step.step_id for step in task.steps] == ['only']
+        assert [type(message) for message in llm.received[0]] == [SystemMessage, HumanMessage]
@@ -1,19 +1,19 @@
-"""Tests for memcore"""
+"""Tests for strategix"""
 
 import pytest
-from memcore import SmartPlanner
+from strategix import TaskPlanner
 
 
-class TestSmartPlanner:
-    """Test cases for SmartPlanner"""
+class TestTaskPlanner:
+    """Test cases for TaskPlanner"""
     
     def test_import(self):
         """Test that the package can be imported"""
-        assert SmartPlanner is not None
+        assert TaskPlanner is not None
     
     def test_initialization(self):
         """Test initialization"""
-        instance = SmartPlanner()
+        instance = TaskPlanner()
         assert instance is not None
     
     # TODO: Add actual tests based on functionality
@@ -22,4 +22,4 @@ class TestSmartPlanner:
 @pytest.fixture
 def sample_instance():
     """Fixture for creating test instance"""
-    return SmartPlanner()
+    return TaskPlanner()